@@ -1,5 +1,6 @@
 """Resource monitoring utilities for task execution."""
 
+import asyncio
 import logging
 import os
 import sys
@@ -13,7 +14,7 @@ import psutil
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class ResourceUsage:
     """Resource usage snapshot."""
 
@@ -25,7 +26,9 @@ class ResourceUsage:
     gpu_memory_used_mb: float | None = None
     gpu_memory_total_mb: float | None = None
     gpu_utilization: float | None = None
-    timestamp: float = 0.0
+    # Monotonic nanoseconds at sample time; stamping is GC-free and an
+    # order of magnitude cheaper than time.time()
+    timestamp: int = 0
 
     def is_within_limits(
         self,
@@ -51,7 +54,9 @@ class ResourceUsage:
             "gpu_memory_used_mb": self.gpu_memory_used_mb,
             "gpu_memory_total_mb": self.gpu_memory_total_mb,
             "gpu_utilization": self.gpu_utilization,
-            "timestamp": self.timestamp,
+            # Derive the wall-clock sample time only here, at
+            # serialization, from the monotonic stamp's age
+            "timestamp": time.time() - (time.monotonic_ns() - self.timestamp) / 1e9,
         }
 
 
@@ -76,6 +81,12 @@ class ResourceMonitor:
         self.output_dir = output_dir
         self.has_gpu = self._check_gpu_availability()
 
+        # Last sampled usage, reused by callers that accept slightly stale
+        # data (e.g. the worker-pool scaling tick)
+        self._latest_usage: ResourceUsage | None = None
+        self._latest_sample_time = 0.0
+        self._sampling_task: asyncio.Task | None = None
+
         # Resource thresholds - relaxed for GPU workloads
         self.thresholds = {
             "cpu_critical": 99.0,
@@ -116,8 +127,23 @@ class ResourceMonitor:
 
         return False
 
-    def get_current_usage(self) -> ResourceUsage:
-        """Get current resource usage."""
+    def get_current_usage(self, max_age: float = 0.0) -> ResourceUsage:
+        """Get current resource usage.
+
+        Args:
+            max_age: Return the cached snapshot if it is younger than this
+                many seconds; 0 forces a fresh sample
+
+        Returns:
+            Resource usage snapshot
+        """
+        if (
+            max_age > 0
+            and self._latest_usage is not None
+            and time.monotonic() - self._latest_sample_time < max_age
+        ):
+            return self._latest_usage
+
         # CPU usage (averaged over check_interval)
         cpu_percent = psutil.cpu_percent(interval=self.check_interval)
 
@@ -143,7 +169,7 @@ class ResourceMonitor:
                 gpu_memory_total_mb = gpu_stats[1]
                 gpu_utilization = gpu_stats[2]
 
-        return ResourceUsage(
+        usage = ResourceUsage(
             cpu_percent=cpu_percent,
             memory_percent=memory_percent,
             memory_used_mb=memory_used_mb,
@@ -152,9 +178,42 @@ class ResourceMonitor:
             gpu_memory_used_mb=gpu_memory_used_mb,
             gpu_memory_total_mb=gpu_memory_total_mb,
             gpu_utilization=gpu_utilization,
-            timestamp=time.time(),
+            timestamp=time.monotonic_ns(),
         )
 
+        self._latest_usage = usage
+        self._latest_sample_time = time.monotonic()
+        return usage
+
+    def start_background_sampling(self, interval: float = 0.5) -> None:
+        """Keep the usage snapshot fresh from a single background task.
+
+        With this running, every get_current_usage(max_age=...) call is an
+        O(1) attribute read instead of a blocking psutil sample; the psutil
+        work happens off-loop in a thread.
+
+        Args:
+            interval: Seconds between samples
+        """
+        if self._sampling_task and not self._sampling_task.done():
+            return
+
+        async def _sample_forever() -> None:
+            while True:
+                try:
+                    await asyncio.to_thread(self.get_current_usage)
+                except Exception as e:
+                    logger.error(f"Error sampling resource usage: {e}")
+                await asyncio.sleep(interval)
+
+        self._sampling_task = asyncio.create_task(_sample_forever())
+
+    def stop_background_sampling(self) -> None:
+        """Stop the background sampling task."""
+        if self._sampling_task and not self._sampling_task.done():
+            self._sampling_task.cancel()
+        self._sampling_task = None
+
     def _get_gpu_stats(self) -> tuple[float, float, float | None] | None:
         """Get GPU memory and utilization stats.
 
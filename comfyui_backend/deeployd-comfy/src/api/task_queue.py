@@ -1,5 +1,6 @@
 """Task queue manager with persist-queue for crash recovery."""
 
+import asyncio
 import logging
 import os
 import tempfile
@@ -36,7 +37,7 @@ class TaskStatus(Enum):
     TIMEOUT = "timeout"
 
 
-@dataclass
+@dataclass(slots=True)
 class Task:
     """Task data model."""
 
@@ -135,6 +136,16 @@ class TaskQueueManager:
         self.active_tasks: dict[str, Task] = {}
         self.task_lock = Lock()
 
+        # Wake signal for event-driven workers: set on every enqueue so
+        # idle workers pick up work immediately instead of polling
+        self._wake = asyncio.Event()
+
+        # O(1) queue-size counter, seeded from whatever persisted across
+        # restarts; saves a SQLite count per queue on every size probe
+        self._size = int(
+            self.high_queue.size + self.normal_queue.size + self.low_queue.size
+        )
+
         # Statistics
         self.stats = {
             "total_enqueued": 0,
@@ -172,6 +183,8 @@ class TaskQueueManager:
 
                 self.active_tasks[task.task_id] = task
                 self.stats["total_enqueued"] += 1
+                self._size += 1
+                self._wake.set()
 
                 logger.info(
                     f"Task {task.task_id} enqueued with priority {task.priority.name}"
@@ -201,6 +214,7 @@ class TaskQueueManager:
 
                     with self.task_lock:
                         self.active_tasks[task.task_id] = task
+                        self._size -= 1
 
                     logger.info(f"Dequeued task {task.task_id}")
                     return task
@@ -264,6 +278,8 @@ class TaskQueueManager:
                 # Select queue based on priority and add directly
                 queue = self._get_queue_for_priority(task.priority)
                 queue.put(task.to_dict())
+                self._size += 1
+                self._wake.set()
 
             else:
                 # Move to dead letter queue
@@ -332,9 +348,38 @@ class TaskQueueManager:
 
             return position
 
+    def dequeue_batch(self, max_n: int = 10) -> list[Task]:
+        """Dequeue up to max_n tasks in priority order.
+
+        Lets a worker drain a burst in one wakeup instead of re-entering
+        the dequeue path once per task.
+
+        Args:
+            max_n: Maximum number of tasks to return
+
+        Returns:
+            Up to max_n tasks (empty list if queues are empty)
+        """
+        tasks: list[Task] = []
+        while len(tasks) < max_n:
+            task = self.dequeue_task()
+            if task is None:
+                break
+            tasks.append(task)
+        return tasks
+
+    async def wait_for_task(self) -> None:
+        """Block until a task is enqueued.
+
+        Returns immediately if an enqueue happened since the last wait,
+        so a wakeup can never be lost between dequeue and wait.
+        """
+        await self._wake.wait()
+        self._wake.clear()
+
     def get_total_queue_size(self) -> int:
-        """Get total number of tasks in all queues."""
-        return int(self.high_queue.size + self.normal_queue.size + self.low_queue.size)
+        """Get total number of tasks in all queues (O(1) counter read)."""
+        return max(0, self._size)
 
     def get_queue_stats(self) -> dict[str, Any]:
         """Get queue statistics."""
@@ -2,26 +2,37 @@
 
 import asyncio
 import logging
+import time
 from collections import defaultdict
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Any
 
+import orjson
 from fastapi import WebSocketDisconnect
 
 logger = logging.getLogger(__name__)
 
+# Constant control frames, serialized once at import. Frames are sent
+# as text to match the send_json frames the API endpoints emit on the
+# same sockets — clients must keep seeing a single all-text protocol.
+_PONG_FRAME = orjson.dumps({"type": "pong"}).decode()
+_HEARTBEAT_FRAME = orjson.dumps({"type": "heartbeat"}).decode()
+
 
 @dataclass
 class ConnectionInfo:
     """Information about a WebSocket connection."""
 
     websocket: Any
-    prompt_id: str | None = None
     connected_at: datetime = field(default_factory=datetime.now)
-    last_ping: datetime = field(default_factory=datetime.now)
+    # Monotonic clock: allocation-free and immune to wall-clock jumps
+    last_ping: float = field(default_factory=time.monotonic)
     client_id: str = ""
-    room: str | None = None
+    # Back-references to every room/prompt this client is registered in,
+    # so disconnect only touches this client's memberships
+    rooms: set[str] = field(default_factory=set)
+    prompts: set[str] = field(default_factory=set)
 
 
 class WebSocketManager:
@@ -35,10 +46,20 @@ class WebSocketManager:
         """
         self.max_connections = max_connections
         self.active_connections: dict[str, ConnectionInfo] = {}
-        self.rooms: dict[str, set[str]] = defaultdict(set)
-        self.prompt_connections: dict[str, set[str]] = defaultdict(set)
+        # client_id -> websocket per room/prompt: broadcasts iterate the
+        # sockets directly instead of resolving each id through
+        # active_connections, while keeping O(1) add/remove by id
+        self.rooms: dict[str, dict[str, Any]] = defaultdict(dict)
+        self.prompt_connections: dict[str, dict[str, Any]] = defaultdict(dict)
         self._lock = asyncio.Lock()
         self._heartbeat_task: asyncio.Task | None = None
+        # O(1) message-type dispatch instead of an if/elif chain
+        self._handlers = {
+            "ping": self._on_ping,
+            "subscribe": self._on_subscribe,
+            "unsubscribe": self._on_unsubscribe,
+            "join_room": self._on_join_room,
+        }
 
     async def connect(
         self,
@@ -71,18 +92,18 @@ class WebSocketManager:
             await websocket.accept()
 
             # Store connection info
-            conn_info = ConnectionInfo(
-                websocket=websocket, prompt_id=prompt_id, client_id=client_id, room=room
-            )
+            conn_info = ConnectionInfo(websocket=websocket, client_id=client_id)
             self.active_connections[client_id] = conn_info
 
             # Add to room if specified
             if room:
-                self.rooms[room].add(client_id)
+                self.rooms[room][client_id] = websocket
+                conn_info.rooms.add(room)
 
             # Track prompt connection
             if prompt_id:
-                self.prompt_connections[prompt_id].add(client_id)
+                self.prompt_connections[prompt_id][client_id] = websocket
+                conn_info.prompts.add(prompt_id)
 
             logger.info(
                 f"WebSocket connected: {client_id} (room: {room}, prompt: {prompt_id})"
@@ -106,17 +127,16 @@ class WebSocketManager:
 
             conn_info = self.active_connections[client_id]
 
-            # Remove from room
-            if conn_info.room:
-                self.rooms[conn_info.room].discard(client_id)
-                if not self.rooms[conn_info.room]:
-                    del self.rooms[conn_info.room]
+            # Remove only this client's memberships (O(k), not O(all rooms))
+            for room in conn_info.rooms:
+                self.rooms[room].pop(client_id, None)
+                if not self.rooms[room]:
+                    del self.rooms[room]
 
-            # Remove from prompt tracking
-            if conn_info.prompt_id:
-                self.prompt_connections[conn_info.prompt_id].discard(client_id)
-                if not self.prompt_connections[conn_info.prompt_id]:
-                    del self.prompt_connections[conn_info.prompt_id]
+            for prompt_id in conn_info.prompts:
+                self.prompt_connections[prompt_id].pop(client_id, None)
+                if not self.prompt_connections[prompt_id]:
+                    del self.prompt_connections[prompt_id]
 
             # Close connection
             try:
@@ -129,12 +149,14 @@ class WebSocketManager:
 
             logger.info(f"WebSocket disconnected: {client_id}")
 
-    async def send_to_client(self, client_id: str, message: dict[str, Any]) -> None:
+    async def send_to_client(
+        self, client_id: str, message: dict[str, Any] | str
+    ) -> None:
         """Send message to specific client.
 
         Args:
             client_id: Client identifier
-            message: Message to send
+            message: Message to send (dict or pre-serialized JSON text)
         """
         if client_id not in self.active_connections:
             logger.warning(f"Client {client_id} not connected")
@@ -142,13 +164,50 @@ class WebSocketManager:
 
         conn_info = self.active_connections[client_id]
         try:
-            await conn_info.websocket.send_json(message)
+            payload = (
+                message if isinstance(message, str) else orjson.dumps(message).decode()
+            )
+            await conn_info.websocket.send_text(payload)
         except WebSocketDisconnect:
             await self.disconnect(client_id)
         except Exception as e:
             logger.error(f"Error sending to {client_id}: {e}")
             await self.disconnect(client_id)
 
+    async def _broadcast(
+        self, targets: list[tuple[str, Any]], message: dict[str, Any] | str
+    ) -> None:
+        """Serialize a message once and fan it out to sockets in parallel.
+
+        Serializing per-recipient with ``send_json`` re-runs ``json.dumps``
+        N times for the same dict; instead dump once with orjson and ship
+        the same text frame to every socket concurrently. Callers that
+        already hold a serialized payload can pass the JSON text to skip
+        serialization entirely. Text frames keep the wire format identical
+        to the ``send_json`` frames the API endpoints emit on these sockets.
+
+        Args:
+            targets: (client_id, websocket) pairs to send to
+            message: Message to broadcast (dict or pre-serialized JSON text)
+        """
+        if not targets:
+            return
+
+        payload = (
+            message if isinstance(message, str) else orjson.dumps(message).decode()
+        )
+
+        results = await asyncio.gather(
+            *(websocket.send_text(payload) for _, websocket in targets),
+            return_exceptions=True,
+        )
+
+        # Reap sockets that failed during the fan-out
+        for (client_id, _), result in zip(targets, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Error sending to {client_id}: {result}")
+                await self.disconnect(client_id)
+
     async def broadcast_to_room(self, room: str, message: dict[str, Any]) -> None:
         """Broadcast message to all clients in a room.
 
@@ -159,31 +218,26 @@ class WebSocketManager:
         if room not in self.rooms:
             return
 
-        # Get list of clients to avoid modification during iteration
-        clients = list(self.rooms[room])
-
-        # Send to all clients in parallel
-        tasks = [self.send_to_client(client_id, message) for client_id in clients]
-        await asyncio.gather(*tasks, return_exceptions=True)
+        # Snapshot the pairs to avoid modification during iteration
+        await self._broadcast(list(self.rooms[room].items()), message)
 
     async def broadcast_to_prompt(
-        self, prompt_id: str, message: dict[str, Any]
+        self, prompt_id: str, message: dict[str, Any] | str
     ) -> None:
         """Broadcast message to all clients monitoring a prompt.
 
+        Progress payloads are plain precomposed dicts (or pre-serialized
+        JSON text); they are serialized once and shipped straight through
+        with no response-model round-trip.
+
         Args:
             prompt_id: Prompt ID
-            message: Message to broadcast
+            message: Message to broadcast (dict or pre-serialized JSON text)
         """
         if prompt_id not in self.prompt_connections:
             return
 
-        # Get list of clients
-        clients = list(self.prompt_connections[prompt_id])
-
-        # Send to all clients in parallel
-        tasks = [self.send_to_client(client_id, message) for client_id in clients]
-        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._broadcast(list(self.prompt_connections[prompt_id].items()), message)
 
     async def broadcast_to_all(self, message: dict[str, Any]) -> None:
         """Broadcast message to all connected clients.
@@ -191,9 +245,13 @@ class WebSocketManager:
         Args:
             message: Message to broadcast
         """
-        clients = list(self.active_connections.keys())
-        tasks = [self.send_to_client(client_id, message) for client_id in clients]
-        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._broadcast(
+            [
+                (client_id, info.websocket)
+                for client_id, info in self.active_connections.items()
+            ],
+            message,
+        )
 
     async def handle_client_message(
         self, client_id: str, message: dict[str, Any]
@@ -204,51 +262,70 @@ class WebSocketManager:
             client_id: Client identifier
             message: Message from client
         """
-        if client_id not in self.active_connections:
+        conn_info = self.active_connections.get(client_id)
+        if conn_info is None:
             return
 
-        conn_info = self.active_connections[client_id]
-
-        # Handle different message types
-        msg_type = message.get("type")
+        # Single dict lookup replaces the per-type elif chain
+        handler = self._handlers.get(message.get("type"))
+        if handler:
+            await handler(client_id, conn_info, message)
 
-        if msg_type == "ping":
-            # Update last ping time
-            conn_info.last_ping = datetime.now()
-            # Send pong response
-            await self.send_to_client(client_id, {"type": "pong"})
+    async def _on_ping(
+        self, client_id: str, conn_info: ConnectionInfo, message: dict[str, Any]
+    ) -> None:
+        """Handle a ping message."""
+        # Update last ping time
+        conn_info.last_ping = time.monotonic()
+        # Send pong response (constant frame, serialized at import)
+        await self.send_to_client(client_id, _PONG_FRAME)
+
+    async def _on_subscribe(
+        self, client_id: str, conn_info: ConnectionInfo, message: dict[str, Any]
+    ) -> None:
+        """Handle a prompt subscription."""
+        prompt_id = message.get("prompt_id")
+        if prompt_id:
+            async with self._lock:
+                self.prompt_connections[prompt_id][client_id] = conn_info.websocket
+                conn_info.prompts.add(prompt_id)
+            await self.send_to_client(
+                client_id, {"type": "subscribed", "prompt_id": prompt_id}
+            )
 
-        elif msg_type == "subscribe":
-            # Subscribe to a prompt
+    async def _on_unsubscribe(
+        self, client_id: str, conn_info: ConnectionInfo, message: dict[str, Any]
+    ) -> None:
+        """Unsubscribe from prompts (all of them unless one is named)."""
+        if conn_info.prompts:
             prompt_id = message.get("prompt_id")
-            if prompt_id:
-                async with self._lock:
-                    conn_info.prompt_id = prompt_id
-                    self.prompt_connections[prompt_id].add(client_id)
-                await self.send_to_client(
-                    client_id, {"type": "subscribed", "prompt_id": prompt_id}
-                )
-
-        elif msg_type == "unsubscribe":
-            # Unsubscribe from prompt
-            if conn_info.prompt_id:
-                async with self._lock:
-                    self.prompt_connections[conn_info.prompt_id].discard(client_id)
-                    conn_info.prompt_id = None
-                await self.send_to_client(client_id, {"type": "unsubscribed"})
-
-        elif msg_type == "join_room":
-            # Join a room
-            room = message.get("room")
-            if room:
-                async with self._lock:
-                    if conn_info.room:
-                        self.rooms[conn_info.room].discard(client_id)
-                    conn_info.room = room
-                    self.rooms[room].add(client_id)
-                await self.send_to_client(
-                    client_id, {"type": "joined_room", "room": room}
+            async with self._lock:
+                to_remove = (
+                    {prompt_id}
+                    if prompt_id and prompt_id in conn_info.prompts
+                    else set(conn_info.prompts)
                 )
+                for pid in to_remove:
+                    self.prompt_connections[pid].pop(client_id, None)
+                    if not self.prompt_connections[pid]:
+                        del self.prompt_connections[pid]
+                    conn_info.prompts.discard(pid)
+            await self.send_to_client(client_id, {"type": "unsubscribed"})
+
+    async def _on_join_room(
+        self, client_id: str, conn_info: ConnectionInfo, message: dict[str, Any]
+    ) -> None:
+        """Join a room (leaving any previous rooms)."""
+        room = message.get("room")
+        if room:
+            async with self._lock:
+                for old_room in conn_info.rooms:
+                    self.rooms[old_room].pop(client_id, None)
+                    if not self.rooms[old_room]:
+                        del self.rooms[old_room]
+                conn_info.rooms = {room}
+                self.rooms[room][client_id] = conn_info.websocket
+            await self.send_to_client(client_id, {"type": "joined_room", "room": room})
 
     async def _heartbeat_loop(self) -> None:
         """Send periodic heartbeat to keep connections alive."""
@@ -256,22 +333,31 @@ class WebSocketManager:
             try:
                 await asyncio.sleep(30)  # Send heartbeat every 30 seconds
 
-                # Check for stale connections
-                now = datetime.now()
-                stale_clients = []
-
-                for client_id, conn_info in self.active_connections.items():
-                    # Check if connection is stale (no ping for 2 minutes)
-                    if now - conn_info.last_ping > timedelta(minutes=2):
-                        stale_clients.append(client_id)
-                    else:
-                        # Send heartbeat
-                        await self.send_to_client(client_id, {"type": "heartbeat"})
-
-                # Disconnect stale clients
-                for client_id in stale_clients:
-                    logger.warning(f"Disconnecting stale client: {client_id}")
-                    await self.disconnect(client_id)
+                # One clock read per sweep; stale = no ping for 2 minutes
+                cutoff = time.monotonic() - 120.0
+                stale_clients = [
+                    client_id
+                    for client_id, conn_info in self.active_connections.items()
+                    if conn_info.last_ping < cutoff
+                ]
+
+                # Disconnect stale clients in parallel so one slow close
+                # doesn't stall the sweep
+                if stale_clients:
+                    logger.warning(f"Disconnecting stale clients: {stale_clients}")
+                    await asyncio.gather(
+                        *(self.disconnect(client_id) for client_id in stale_clients),
+                        return_exceptions=True,
+                    )
+
+                # Heartbeat the survivors with the pre-serialized frame
+                await self._broadcast(
+                    [
+                        (client_id, info.websocket)
+                        for client_id, info in self.active_connections.items()
+                    ],
+                    _HEARTBEAT_FRAME,
+                )
 
             except Exception as e:
                 logger.error(f"Error in heartbeat loop: {e}")
@@ -282,11 +368,14 @@ class WebSocketManager:
 
     def get_room_count(self, room: str) -> int:
         """Get number of connections in a room."""
-        return len(self.rooms.get(room, set()))
+        # Avoid allocating an empty set on every miss (metrics-scrape path)
+        members = self.rooms.get(room)
+        return len(members) if members else 0
 
     def get_prompt_count(self, prompt_id: str) -> int:
         """Get number of connections monitoring a prompt."""
-        return len(self.prompt_connections.get(prompt_id, set()))
+        members = self.prompt_connections.get(prompt_id)
+        return len(members) if members else 0
 
     async def close_all(self) -> None:
         """Close all connections."""
@@ -302,6 +391,10 @@ class WebSocketManager:
 class ProgressTracker:
     """Tracks workflow execution progress."""
 
+    # A fast sampler can fire 50 steps/sec; coalesce so subscribers see at
+    # most one progress frame per interval, always carrying the latest state
+    FLUSH_INTERVAL = 0.05
+
     def __init__(self, websocket_manager: WebSocketManager):
         """Initialize progress tracker.
 
@@ -310,7 +403,9 @@ class ProgressTracker:
         """
         self.ws_manager = websocket_manager
         self.progress_data: dict[str, dict[str, Any]] = {}
-        self.start_times: dict[str, datetime] = {}
+        self.start_times: dict[str, float] = {}
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._flush_tasks: dict[str, asyncio.Task] = {}
 
     async def start_execution(self, prompt_id: str, total_steps: int = 25) -> None:
         """Mark execution start.
@@ -319,7 +414,7 @@ class ProgressTracker:
             prompt_id: Prompt ID
             total_steps: Total number of steps
         """
-        self.start_times[prompt_id] = datetime.now()
+        self.start_times[prompt_id] = time.monotonic()
         self.progress_data[prompt_id] = {
             "status": "started",
             "current_step": 0,
@@ -363,20 +458,35 @@ class ProgressTracker:
 
         # Calculate ETA
         if prompt_id in self.start_times:
-            elapsed = (datetime.now() - self.start_times[prompt_id]).total_seconds()
+            elapsed = time.monotonic() - self.start_times[prompt_id]
             if current_step > 0:
                 avg_time_per_step = elapsed / current_step
                 remaining_steps = data["total_steps"] - current_step
                 eta_seconds = avg_time_per_step * remaining_steps
                 data["eta"] = int(eta_seconds)
 
-        # Send update
+        # Coalesce: stash the latest state and flush at most once per
+        # FLUSH_INTERVAL, so a fast sampler can't outpace the fan-out
         message = {"type": "progress_update", "prompt_id": prompt_id, **data}
 
         if preview_image:
             message["preview_image"] = preview_image
 
-        await self.ws_manager.broadcast_to_prompt(prompt_id, message)
+        self._pending[prompt_id] = message
+        if prompt_id not in self._flush_tasks:
+            self._flush_tasks[prompt_id] = asyncio.create_task(
+                self._flush_after(prompt_id)
+            )
+
+    async def _flush_after(self, prompt_id: str) -> None:
+        """Broadcast the latest pending update after the coalescing window."""
+        try:
+            await asyncio.sleep(self.FLUSH_INTERVAL)
+            message = self._pending.pop(prompt_id, None)
+            if message is not None:
+                await self.ws_manager.broadcast_to_prompt(prompt_id, message)
+        finally:
+            self._flush_tasks.pop(prompt_id, None)
 
     async def complete_execution(
         self, prompt_id: str, images: list[Any] | None = None, error: str | None = None
@@ -391,13 +501,19 @@ class ProgressTracker:
         if prompt_id not in self.progress_data:
             return
 
+        # Completion goes out immediately; drop any coalesced update in flight
+        flush_task = self._flush_tasks.pop(prompt_id, None)
+        if flush_task is not None:
+            flush_task.cancel()
+        self._pending.pop(prompt_id, None)
+
         status = "failed" if error else "completed"
         self.progress_data[prompt_id]["status"] = status
 
         # Calculate total time
         total_time = None
         if prompt_id in self.start_times:
-            total_time = (datetime.now() - self.start_times[prompt_id]).total_seconds()
+            total_time = time.monotonic() - self.start_times[prompt_id]
 
         message: dict[str, Any] = {
             "type": "execution_complete",
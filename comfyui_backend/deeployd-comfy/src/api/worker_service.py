@@ -11,7 +11,7 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Any
 
-from src.api.resource_monitor import ResourceMonitor
+from src.api.resource_monitor import ResourceMonitor, ResourceUsage
 from src.api.task_executor import TaskExecutor
 from src.api.task_queue import Task, TaskQueueManager
 from src.api.websocket_manager import WebSocketManager
@@ -31,7 +31,7 @@ class WorkerStatus(Enum):
     ERROR = "error"
 
 
-@dataclass
+@dataclass(slots=True)
 class WorkerInfo:
     """Information about a worker."""
 
@@ -40,8 +40,10 @@ class WorkerInfo:
     current_task: str | None = None
     tasks_completed: int = 0
     tasks_failed: int = 0
-    start_time: float = 0.0
-    last_task_time: float = 0.0
+    # Monotonic nanoseconds; only ever used for duration math, so the
+    # cheaper GC-free clock wins over datetime/time.time()
+    start_time: int = 0
+    last_task_time: int = 0
     error_message: str | None = None
 
 
@@ -54,6 +56,7 @@ class Worker:
         queue_manager: TaskQueueManager,
         task_executor: TaskExecutor,
         poll_interval: float = 2.0,
+        batch_size: int = 1,
     ):
         """Initialize worker.
 
@@ -61,15 +64,21 @@ class Worker:
             worker_id: Unique worker identifier
             queue_manager: Task queue manager
             task_executor: Task executor
-            poll_interval: Queue polling interval in seconds
+            poll_interval: Safety-net wait in seconds; workers are woken
+                immediately on enqueue and only fall back to this timeout
+            batch_size: Maximum tasks drained from the queue per wakeup.
+                Defaults to 1 so pooled workers each take one task and
+                a burst spreads across the pool; raise it only for a
+                single-worker deployment where draining cuts wakeups
         """
         self.worker_id = worker_id
         self.queue_manager = queue_manager
         self.task_executor = task_executor
         self.poll_interval = poll_interval
+        self.batch_size = batch_size
 
         self.info = WorkerInfo(
-            worker_id=worker_id, status=WorkerStatus.IDLE, start_time=time.time()
+            worker_id=worker_id, status=WorkerStatus.IDLE, start_time=time.monotonic_ns()
         )
 
         self.running = False
@@ -98,16 +107,25 @@ class Worker:
                     await asyncio.sleep(self.poll_interval)
                     continue
 
-                # Get next task from queue
-                task = self.queue_manager.dequeue_task()
+                # Drain up to a batch of tasks per wakeup
+                tasks = self.queue_manager.dequeue_batch(self.batch_size)
 
-                if task:
-                    await self.process_task(task)
+                if tasks:
+                    # Process the whole batch even if stop() arrives midway:
+                    # these tasks are already off the persistent queue
+                    for task in tasks:
+                        await self.process_task(task)
                 else:
-                    # No tasks available
+                    # No tasks available: wait for the enqueue wake signal,
+                    # with the poll interval as a safety net for tasks that
+                    # re-enter the queue out of band (e.g. retries)
                     self.info.status = WorkerStatus.IDLE
                     self.info.current_task = None
-                    await asyncio.sleep(self.poll_interval)
+                    with contextlib.suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(
+                            self.queue_manager.wait_for_task(),
+                            timeout=self.poll_interval,
+                        )
 
             except Exception as e:
                 logger.error(f"Worker {self.worker_id} error: {e}")
@@ -136,14 +154,14 @@ class Worker:
 
             # Update stats
             self.info.tasks_completed += 1
-            self.info.last_task_time = time.time()
+            self.info.last_task_time = time.monotonic_ns()
 
             logger.info(f"Worker {self.worker_id} completed task {task.task_id}")
 
         except Exception as e:
             logger.error(f"Worker {self.worker_id} failed task {task.task_id}: {e}")
             self.info.tasks_failed += 1
-            self.info.last_task_time = time.time()
+            self.info.last_task_time = time.monotonic_ns()
             self.info.error_message = str(e)
 
         finally:
@@ -167,12 +185,24 @@ class Worker:
         logger.info(f"Worker {self.worker_id} stopping")
 
     def get_info(self) -> WorkerInfo:
-        """Get worker information."""
+        """Get worker information.
+
+        Returns the live WorkerInfo that the worker mutates in place —
+        one instance per worker for its whole lifetime, so no allocation
+        per status update. Callers needing a frozen snapshot should
+        ``dataclasses.replace()`` it themselves.
+        """
         return self.info
 
 
 class WorkerPool:
-    """Manages a pool of workers."""
+    """Manages a pool of workers.
+
+    Workers are pure asyncio coroutines sharing the pool's event loop —
+    no per-worker thread or subprocess is ever created, so each worker
+    costs a coroutine frame rather than megabytes of stack/RSS. Keep it
+    that way: scaling max_workers into the hundreds relies on it.
+    """
 
     def __init__(
         self,
@@ -201,7 +231,22 @@ class WorkerPool:
         self.max_workers = max_workers
         self.scale_threshold = scale_threshold
 
-        self.workers: dict[str, Worker] = {}
+        # Specialize the scaling predicates for this pool's fixed
+        # config: closure cells are cheaper than re-reading four
+        # attributes off self every monitor tick
+        def _scale_up(q: int, a: int, mem: float, cpu: float) -> bool:
+            return q > scale_threshold * a and a < max_workers and mem < 70 and cpu < 80
+
+        def _scale_down(q: int, a: int) -> bool:
+            return q < a and a > min_workers
+
+        self._scale_up = _scale_up
+        self._scale_down = _scale_down
+
+        # Fixed slot array plus id->slot map: scans (pause/resume/idle
+        # lookup) walk a contiguous list instead of hashing dict keys
+        self._slots: list[Worker | None] = [None] * max_workers
+        self._index: dict[str, int] = {}
         self.worker_tasks: dict[str, asyncio.Task] = {}
         self.resource_monitor = ResourceMonitor(
             output_dir=os.getenv("OUTPUT_DIR", "/app/outputs")
@@ -221,10 +266,20 @@ class WorkerPool:
 
         logger.info(f"WorkerPool initialized (min={min_workers}, max={max_workers})")
 
+    @property
+    def workers(self) -> dict[str, Worker]:
+        """View of active workers keyed by worker id."""
+        return {
+            worker.worker_id: worker for worker in self._slots if worker is not None
+        }
+
     async def start(self) -> None:
         """Start the worker pool."""
         self.running = True
 
+        # Keep the resource snapshot fresh off the scaling hot path
+        self.resource_monitor.start_background_sampling()
+
         # Start minimum workers
         for i in range(self.min_workers):
             await self.add_worker(f"worker-{i}")
@@ -232,7 +287,7 @@ class WorkerPool:
         # Start monitoring task
         self.monitor_task = asyncio.create_task(self.monitor_and_scale())
 
-        logger.info(f"WorkerPool started with {len(self.workers)} workers")
+        logger.info(f"WorkerPool started with {len(self._index)} workers")
 
     async def add_worker(self, worker_id: str | None = None) -> bool:
         """Add a new worker to the pool.
@@ -243,14 +298,14 @@ class WorkerPool:
         Returns:
             True if worker added successfully
         """
-        if len(self.workers) >= self.max_workers:
+        if len(self._index) >= self.max_workers:
             logger.warning("Cannot add worker: max workers reached")
             return False
 
         if not worker_id:
-            worker_id = f"worker-{len(self.workers)}"
+            worker_id = f"worker-{len(self._index)}"
 
-        if worker_id in self.workers:
+        if worker_id in self._index:
             logger.warning(f"Worker {worker_id} already exists")
             return False
 
@@ -261,7 +316,9 @@ class WorkerPool:
             task_executor=self.task_executor,
         )
 
-        self.workers[worker_id] = worker
+        slot = self._slots.index(None)
+        self._slots[slot] = worker
+        self._index[worker_id] = slot
         self.worker_tasks[worker_id] = asyncio.create_task(worker.start())
 
         logger.info(f"Added worker {worker_id}")
@@ -276,17 +333,19 @@ class WorkerPool:
         Returns:
             True if worker removed successfully
         """
-        if worker_id not in self.workers:
+        if worker_id not in self._index:
             logger.warning(f"Worker {worker_id} not found")
             return False
 
-        if len(self.workers) <= self.min_workers:
+        if len(self._index) <= self.min_workers:
             logger.warning("Cannot remove worker: min workers reached")
             return False
 
         # Stop worker
-        worker = self.workers[worker_id]
-        worker.stop()
+        slot = self._index[worker_id]
+        worker = self._slots[slot]
+        if worker is not None:
+            worker.stop()
 
         # Wait for task to complete
         if worker_id in self.worker_tasks:
@@ -299,43 +358,68 @@ class WorkerPool:
                     await task
 
         # Remove from pool
-        del self.workers[worker_id]
+        self._slots[slot] = None
+        del self._index[worker_id]
         del self.worker_tasks[worker_id]
 
         logger.info(f"Removed worker {worker_id}")
         return True
 
+    def _decide_scale_action(
+        self, queue_size: int, active_workers: int, usage: ResourceUsage
+    ) -> str:
+        """Decide the scaling action for one snapshot of pool state.
+
+        Args:
+            queue_size: Total queued tasks at snapshot time
+            active_workers: Number of active workers at snapshot time
+            usage: Resource usage at snapshot time
+
+        Returns:
+            One of "up", "down" or "noop"
+        """
+        if self._scale_up(
+            queue_size, active_workers, usage.memory_percent, usage.cpu_percent
+        ):
+            return "up"
+        if self._scale_down(queue_size, active_workers):
+            return "down"
+        return "noop"
+
     async def monitor_and_scale(self) -> None:
         """Monitor queue and scale workers as needed."""
         while self.running:
             try:
-                # Get queue size
+                # One snapshot per tick; the decision predicate never
+                # re-probes the queue or the resource monitor
                 queue_size = self.queue_manager.get_total_queue_size()
-                active_workers = len(self.workers)
-
-                # Check resource usage
-                usage = self.resource_monitor.get_current_usage()
-
-                # Scale up if queue is large and resources available
-                if (
-                    queue_size > self.scale_threshold * active_workers
-                    and active_workers < self.max_workers
-                    and usage.memory_percent < 70
-                    and usage.cpu_percent < 80
-                ):
+                active_workers = len(self._index)
+                usage = self.resource_monitor.get_current_usage(max_age=5.0)
+
+                action = self._decide_scale_action(queue_size, active_workers, usage)
+
+                if action == "up":
                     await self.add_worker()
                     logger.info(
-                        f"Scaled up to {len(self.workers)} workers (queue size: {queue_size})"
+                        f"Scaled up to {len(self._index)} workers (queue size: {queue_size})"
+                    )
+                elif action == "down":
+                    # Find idle worker to remove (contiguous slot scan)
+                    idle_worker = next(
+                        (
+                            worker
+                            for worker in self._slots
+                            if worker and worker.info.status == WorkerStatus.IDLE
+                        ),
+                        None,
                     )
+                    if idle_worker:
+                        await self.remove_worker(idle_worker.worker_id)
+                        logger.info(f"Scaled down to {len(self._index)} workers")
 
-                # Scale down if queue is small
-                elif queue_size < active_workers and active_workers > self.min_workers:
-                    # Find idle worker to remove
-                    for worker_id, worker in self.workers.items():
-                        if worker.info.status == WorkerStatus.IDLE:
-                            await self.remove_worker(worker_id)
-                            logger.info(f"Scaled down to {len(self.workers)} workers")
-                            break
+                # Evict stale completed tasks so the in-memory tracking
+                # dict stays bounded regardless of traffic
+                self.queue_manager.cleanup_completed()
 
                 # Sleep before next check
                 await asyncio.sleep(10.0)
@@ -346,20 +430,25 @@ class WorkerPool:
 
     def pause_all(self) -> None:
         """Pause all workers."""
-        for worker in self.workers.values():
-            worker.pause()
+        for worker in self._slots:
+            if worker:
+                worker.pause()
         logger.info("All workers paused")
 
     def resume_all(self) -> None:
         """Resume all workers."""
-        for worker in self.workers.values():
-            worker.resume()
+        for worker in self._slots:
+            if worker:
+                worker.resume()
         logger.info("All workers resumed")
 
     async def stop(self) -> None:
         """Stop the worker pool."""
         self.running = False
 
+        # Stop background resource sampling
+        self.resource_monitor.stop_background_sampling()
+
         # Cancel monitoring
         if self.monitor_task:
             self.monitor_task.cancel()
@@ -367,8 +456,9 @@ class WorkerPool:
                 await self.monitor_task
 
         # Stop all workers
-        for worker in self.workers.values():
-            worker.stop()
+        for worker in self._slots:
+            if worker:
+                worker.stop()
 
         # Wait for all worker tasks with timeout
         if self.worker_tasks:
@@ -378,11 +468,13 @@ class WorkerPool:
                     timeout=2.0,  # 2 second timeout
                 )
             except asyncio.TimeoutError:
-                # Force cancel all tasks
+                # Force cancel all tasks and wait for the cancellations
+                # to land — deterministic, no fixed settle delay
                 for task in self.worker_tasks.values():
                     task.cancel()
-                # Wait briefly for cancellation
-                await asyncio.sleep(0.1)
+                await asyncio.gather(
+                    *self.worker_tasks.values(), return_exceptions=True
+                )
 
         # Cleanup
         self.task_executor.cleanup_resources()
@@ -396,7 +488,9 @@ class WorkerPool:
             Pool status information
         """
         worker_info = []
-        for worker in self.workers.values():
+        for worker in self._slots:
+            if worker is None:
+                continue
             info = worker.get_info()
             worker_info.append(
                 {
@@ -405,7 +499,7 @@ class WorkerPool:
                     "current_task": info.current_task,
                     "tasks_completed": info.tasks_completed,
                     "tasks_failed": info.tasks_failed,
-                    "uptime": time.time() - info.start_time,
+                    "uptime": (time.monotonic_ns() - info.start_time) / 1e9,
                 }
             )
 
@@ -414,7 +508,7 @@ class WorkerPool:
 
         return {
             "workers": worker_info,
-            "worker_count": len(self.workers),
+            "worker_count": len(self._index),
             "min_workers": self.min_workers,
             "max_workers": self.max_workers,
             "queue_size": self.queue_manager.get_total_queue_size(),
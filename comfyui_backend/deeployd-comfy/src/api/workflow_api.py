@@ -436,11 +436,15 @@ async def get_image(filename: str, format: str = "file") -> Any:
 
     if format == "base64":
         import base64
-        with open(image_path, "rb") as f:
-            image_data = f.read()
-            encoded = base64.b64encode(image_data).decode('utf-8')
-            return {"filename": filename, "base64": f"data:image/png;base64,{encoded}"}
+
+        # Reading a multi-MB PNG would block the event loop; push it to
+        # the default thread pool
+        image_data = await asyncio.to_thread(image_path.read_bytes)
+        encoded = base64.b64encode(image_data).decode("utf-8")
+        return {"filename": filename, "base64": f"data:image/png;base64,{encoded}"}
     else:
+        # FileResponse serves via sendfile(2) under uvicorn — no
+        # userspace copy of the image bytes
         return FileResponse(path=image_path, media_type="image/png", filename=filename)
 
 
@@ -13,7 +13,7 @@ from typing import Any
 import aiohttp
 import websockets
 from fastapi import HTTPException
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 logger = logging.getLogger(__name__)
 
@@ -397,6 +397,11 @@ class WorkflowExecutor:
 class WorkflowRequest(BaseModel):  # type: ignore[no-any-unimported]
     """Request model for Z-Image Turbo FP8 workflow execution."""
 
+    # Validated on the /api/generate hot path: frozen skips the
+    # per-field setattr machinery and extra="ignore" avoids building
+    # error objects for unknown client keys
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     # Required
     positive_prompt: str = Field(
         ...,
@@ -439,6 +444,8 @@ class WorkflowRequest(BaseModel):  # type: ignore[no-any-unimported]
 class WorkflowResponse(BaseModel):  # type: ignore[no-any-unimported]
     """Response model for workflow execution."""
 
+    model_config = ConfigDict(frozen=True)
+
     prompt_id: str
     status: str
     images: list[str] | None = None
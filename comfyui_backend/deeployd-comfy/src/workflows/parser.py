@@ -1,9 +1,11 @@
 """Workflow parser for ComfyUI JSON format."""
 
-import json
+import json  # noqa: F401 — orjson.JSONDecodeError subclasses json's
 from pathlib import Path
 from typing import Any
 
+import orjson
+
 from src.workflows.constants import BUILTIN_NODES
 from src.workflows.converter import WorkflowConverter
 
@@ -31,6 +33,7 @@ class WorkflowParseResult:
         self.is_valid = is_valid
         self.errors = errors or []
         self._connections: list[dict[str, Any]] | None = None
+        self._by_target: dict[tuple[str, str], tuple[str, int]] | None = None
 
     def get_connections(self) -> list[dict[str, Any]]:
         """Extract connections between nodes.
@@ -42,6 +45,7 @@ class WorkflowParseResult:
             return self._connections
 
         connections = []
+        by_target: dict[tuple[str, str], tuple[str, int]] = {}
         for node_id, node_data in self.nodes.items():
             inputs = node_data.get("inputs", {})
             for input_name, input_value in inputs.items():
@@ -58,10 +62,30 @@ class WorkflowParseResult:
                                 "to_input": input_name,
                             }
                         )
+                        by_target[(node_id, input_name)] = (
+                            input_value[0],
+                            input_value[1],
+                        )
 
         self._connections = connections
+        self._by_target = by_target
         return connections
 
+    @property
+    def connections_by_target(self) -> dict[tuple[str, str], tuple[str, int]]:
+        """Connections indexed by (to_node, to_input).
+
+        Built in the same single pass as :meth:`get_connections`;
+        callers looking up a specific edge get an O(1) hash lookup
+        instead of scanning the connection list.
+
+        Returns:
+            Mapping of (to_node, to_input) to (from_node, from_output)
+        """
+        if self._by_target is None:
+            self.get_connections()
+        return self._by_target  # type: ignore[return-value]
+
     def get_custom_nodes(self) -> set[str]:
         """Identify custom nodes in the workflow.
 
@@ -187,19 +211,31 @@ class WorkflowParser:
 
         return WorkflowParseResult(nodes=nodes, format=format_type, is_valid=True)
 
-    def parse_string(self, workflow_json: str) -> WorkflowParseResult:
-        """Parse a workflow from JSON string.
+    def detect_format(self, workflow_data: dict[str, Any]) -> str:
+        """Detect workflow format without running a full parse.
+
+        Args:
+            workflow_data: Workflow data as dictionary
+
+        Returns:
+            Format string ("api" or "ui")
+        """
+        return self.converter.detect_format(workflow_data)
+
+    def parse_string(self, workflow_json: str | bytes) -> WorkflowParseResult:
+        """Parse a workflow from JSON string or bytes.
 
         Args:
-            workflow_json: Workflow as JSON string
+            workflow_json: Workflow as JSON string or UTF-8 bytes
 
         Returns:
             WorkflowParseResult object
 
         Raises:
-            json.JSONDecodeError: If JSON is malformed
+            json.JSONDecodeError: If JSON is malformed (orjson's decode
+                error is a subclass)
         """
-        workflow_data = json.loads(workflow_json)
+        workflow_data = orjson.loads(workflow_json)
         return self.parse(workflow_data)
 
     def parse_file(self, filepath: str | Path) -> WorkflowParseResult:
@@ -218,8 +254,8 @@ class WorkflowParser:
         if not filepath.exists():
             raise FileNotFoundError(f"Workflow file not found: {filepath}")
 
-        with open(filepath, encoding="utf-8") as f:
-            workflow_data = json.load(f)
+        # orjson parses the raw bytes directly — no intermediate str
+        workflow_data = orjson.loads(filepath.read_bytes())
 
         return self.parse(workflow_data)
 
@@ -1,12 +1,21 @@
 """Workflow validator for ComfyUI workflows."""
 
+import re
+import sys
+from collections import deque
+from collections.abc import Callable
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Any
 
-from src.workflows.analyzer import NodeAnalyzer
 from src.workflows.constants import BUILTIN_NODES
 from src.workflows.converter import WorkflowConverter
 
+# Compiled once at import: one C-level scan per path replaces a chain
+# of Python substring probes. Catches relative traversal, absolute
+# Unix/Windows paths, /etc/ references, UNC prefixes and embedded NULs.
+_UNSAFE_PATH = re.compile(r"(?:^/|\.\.[\\/]|/etc/|^[A-Za-z]:[\\/]|\\\\|\x00)")
+
 
 class ValidationError(Exception):
     """Custom exception for validation errors."""
@@ -14,7 +23,7 @@ class ValidationError(Exception):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class ValidationResult:
     """Result of workflow validation."""
 
@@ -74,7 +83,6 @@ class WorkflowValidator:
 
     def __init__(self):
         """Initialize validator."""
-        self.analyzer = NodeAnalyzer()
         self.converter = WorkflowConverter()
 
     def validate(
@@ -113,6 +121,17 @@ class WorkflowValidator:
 
         metadata["node_count"] = len(nodes)
 
+        # Intern class_type strings once up front: every later dict and
+        # set lookup (strict dispatch, BUILTIN_NODES membership, required
+        # inputs) then compares interned pointers with cached hashes
+        # instead of re-hashing the same few names per node
+        for node_data in nodes.values():
+            if not isinstance(node_data, dict):
+                continue
+            class_type = node_data.get("class_type")
+            if isinstance(class_type, str):
+                node_data["class_type"] = sys.intern(class_type)
+
         # Basic structure validation
         for node_id, node_data in nodes.items():
             if not self._validate_node_structure(
@@ -175,19 +194,12 @@ class WorkflowValidator:
             errors.append(f"Node {node_id}: Missing 'class_type' field")
             return False
 
-        # Validate input types if strict
+        # Validate input types if strict: dispatch straight to the
+        # per-class checker instead of walking an if/elif chain
         if strict_types and "inputs" in node_data:
-            inputs = node_data["inputs"]
-            class_type = node_data["class_type"]
-
-            # Check specific input types for known nodes
-            if class_type == "EmptyLatentImage":
-                for field in ["width", "height", "batch_size"]:
-                    if field in inputs and not isinstance(inputs[field], int | float):
-                        errors.append(
-                            f"Node {node_id}: Input '{field}' has invalid type "
-                            f"(expected number, got {type(inputs[field]).__name__})"
-                        )
+            checker = _STRICT_CHECKERS.get(node_data["class_type"])
+            if checker is not None:
+                errors.extend(checker(node_id, node_data["inputs"]))
 
         return True
 
@@ -198,6 +210,25 @@ class WorkflowValidator:
             workflow: Workflow dictionary
             errors: List to append errors to
         """
+        # One comprehension collects every referenced source ID; the
+        # C-level set difference finds missing nodes in a single pass
+        # instead of hashing each edge against the workflow dict
+        referenced = {
+            value[0]
+            for node_data in workflow.values()
+            for value in node_data.get("inputs", {}).values()
+            if isinstance(value, list) and len(value) == 2
+        }
+        missing = referenced - workflow.keys()
+
+        # Output counts gathered once per validate(); the per-edge check
+        # below becomes a dict hit plus an int compare instead of a
+        # nested dict.get + len on every edge
+        out_counts: dict[str, int | None] = {}
+        for ref_id in referenced - missing:
+            outputs = workflow[ref_id].get("outputs")
+            out_counts[ref_id] = len(outputs) if outputs is not None else None
+
         for node_id, node_data in workflow.items():
             inputs = node_data.get("inputs", {})
 
@@ -207,8 +238,9 @@ class WorkflowValidator:
                     ref_node_id = input_value[0]
                     ref_output_idx = input_value[1]
 
-                    # Check if referenced node exists
-                    if ref_node_id not in workflow:
+                    # Per-edge membership only probes the (usually
+                    # empty) missing set, keeping the detailed message
+                    if missing and ref_node_id in missing:
                         errors.append(
                             f"Node {node_id}: Input '{input_name}' references "
                             f"non-existent node '{ref_node_id}'"
@@ -219,62 +251,61 @@ class WorkflowValidator:
                     # Note: Most nodes don't have explicit outputs defined in the workflow
                     # The connections are validated by ComfyUI when creating the workflow
                     # We only validate if outputs are explicitly defined
-                    ref_node = workflow[ref_node_id]
-                    ref_outputs = ref_node.get("outputs")
+                    out_count = out_counts[ref_node_id]
 
-                    if ref_outputs is not None and isinstance(ref_output_idx, int):  # noqa: SIM102
+                    if out_count is not None and isinstance(ref_output_idx, int):  # noqa: SIM102
                         # Only validate if outputs are explicitly defined
-                        if ref_output_idx >= len(ref_outputs):
+                        if ref_output_idx >= out_count:
                             errors.append(
                                 f"Node {node_id}: Input '{input_name}' references "
                                 f"invalid output index {ref_output_idx} "
-                                f"(node '{ref_node_id}' has {len(ref_outputs)} outputs)"
+                                f"(node '{ref_node_id}' has {out_count} outputs)"
                             )
 
     def _check_circular_dependencies(self, workflow: dict[str, Any], errors: list[str]):
         """Check for circular dependencies.
 
+        Node IDs are remapped once to contiguous integer indices, then
+        Tarjan's algorithm (iterative, explicit work stack — no Python
+        recursion, so depth is unbounded) enumerates every strongly
+        connected component in one O(V+E) pass. Each non-trivial
+        component is reported as its own cycle.
+
         Args:
             workflow: Workflow dictionary
             errors: List to append errors to
         """
-        # Build adjacency list
-        graph = {node_id: [] for node_id in workflow}
+        ids = list(workflow)
+        id2idx = {node_id: i for i, node_id in enumerate(ids)}
+        n = len(ids)
+        adj: list[list[int]] = [[] for _ in range(n)]
 
         for node_id, node_data in workflow.items():
-            inputs = node_data.get("inputs", {})
-            for input_value in inputs.values():
+            dst = id2idx[node_id]
+            for input_value in node_data.get("inputs", {}).values():
                 if isinstance(input_value, list) and len(input_value) == 2:
-                    ref_node_id = input_value[0]
-                    if ref_node_id in workflow:
-                        graph[ref_node_id].append(node_id)
-
-        # Check for cycles using DFS
-        visited = set()
-        rec_stack = set()
-
-        def has_cycle(node: str, path: list[str]) -> bool:
-            visited.add(node)
-            rec_stack.add(node)
-            path.append(node)
-
-            for neighbor in graph[node]:
-                if neighbor not in visited:
-                    if has_cycle(neighbor, path.copy()):
-                        return True
-                elif neighbor in rec_stack:
-                    cycle_path = path[path.index(neighbor) :] + [neighbor]
-                    errors.append(
-                        f"Circular dependency detected: {' -> '.join(cycle_path)}"
-                    )
-                    return True
-
-            rec_stack.remove(node)
-            return False
+                    src = id2idx.get(input_value[0])
+                    if src is not None:
+                        adj[src].append(dst)
+
+        for component in _tarjan_sccs(adj):
+            if len(component) == 1 and component[0] not in adj[component[0]]:
+                continue
 
-        for node in graph:
-            if node not in visited:
-                has_cycle(node, [])
+            # Walk successors inside the component to turn the SCC's
+            # vertex set into a concrete cycle path for the message
+            members = set(component)
+            path: list[int] = []
+            pos: dict[int, int] = {}
+            u = component[0]
+            while u not in pos:
+                pos[u] = len(path)
+                path.append(u)
+                u = next(v for v in adj[u] if v in members)
+            cycle = path[pos[u] :] + [u]
+            errors.append(
+                f"Circular dependency detected: {' -> '.join(ids[i] for i in cycle)}"
+            )
 
     def _validate_required_inputs(self, workflow: dict[str, Any], errors: list[str]):
         """Validate required inputs for known nodes.
@@ -285,17 +316,16 @@ class WorkflowValidator:
         """
         for node_id, node_data in workflow.items():
             class_type = node_data.get("class_type", "")
+            required = _required_inputs(class_type)
+            if not required:
+                continue
 
-            if class_type in self.REQUIRED_INPUTS:
-                required = self.REQUIRED_INPUTS[class_type]
-                inputs = node_data.get("inputs", {})
-
-                for req_input in required:
-                    if req_input not in inputs:
-                        errors.append(
-                            f"Node {node_id} ({class_type}): "
-                            f"Missing required input '{req_input}'"
-                        )
+            inputs = node_data.get("inputs", {})
+            for req_input in required - inputs.keys():
+                errors.append(
+                    f"Node {node_id} ({class_type}): "
+                    f"Missing required input '{req_input}'"
+                )
 
     def _check_output_nodes(self, workflow: dict[str, Any], warnings: list[str]):
         """Check for output nodes.
@@ -341,35 +371,46 @@ class WorkflowValidator:
     def _check_disconnected_nodes(self, workflow: dict[str, Any], warnings: list[str]):
         """Check for disconnected/unused nodes.
 
+        One reverse BFS from the output sinks (SaveImage/PreviewImage)
+        marks every node whose result can reach an output. Anything left
+        unvisited — including whole chains that only feed dead ends — is
+        flagged, in O(V+E) rather than per-node reference scans.
+
         Args:
             workflow: Workflow dictionary
             warnings: List to append warnings to
         """
-        # Find nodes that have outputs but aren't connected to anything
-        nodes_with_outputs = set()
-        referenced_nodes = set()
-
-        for node_id, node_data in workflow.items():
-            outputs = node_data.get("outputs", [])
-            if outputs:
-                nodes_with_outputs.add(node_id)
-
-            inputs = node_data.get("inputs", {})
-            for input_value in inputs.values():
-                if isinstance(input_value, list) and len(input_value) == 2:
-                    referenced_nodes.add(input_value[0])
-
-        # Find nodes with outputs that aren't referenced
-        unused_nodes = nodes_with_outputs - referenced_nodes
-
-        # Exclude output nodes (they don't need to be referenced)
         output_types = {"SaveImage", "PreviewImage"}
-        unused_nodes = {
-            node_id
-            for node_id in unused_nodes
-            if workflow[node_id].get("class_type", "") not in output_types
-        }
 
+        # Reverse adjacency (consumer -> producers) and sinks in one pass
+        producers: dict[str, list[str]] = {node_id: [] for node_id in workflow}
+        sinks: list[str] = []
+        for node_id, node_data in workflow.items():
+            if node_data.get("class_type", "") in output_types:
+                sinks.append(node_id)
+            for input_value in node_data.get("inputs", {}).values():
+                if (
+                    isinstance(input_value, list)
+                    and len(input_value) == 2
+                    and input_value[0] in producers
+                ):
+                    producers[node_id].append(input_value[0])
+
+        if not sinks:
+            # _check_output_nodes already warns about missing outputs;
+            # flagging every node here would just be noise
+            return
+
+        reachable = set(sinks)
+        queue = deque(sinks)
+        while queue:
+            node_id = queue.popleft()
+            for source_id in producers[node_id]:
+                if source_id not in reachable:
+                    reachable.add(source_id)
+                    queue.append(source_id)
+
+        unused_nodes = workflow.keys() - reachable
         if unused_nodes:
             warnings.append(
                 f"Disconnected or unused nodes found: {', '.join(sorted(unused_nodes))}"
@@ -382,29 +423,26 @@ class WorkflowValidator:
             workflow: Workflow dictionary
             errors: List to append errors to
         """
-        dangerous_patterns = ["../", "..\\", "/etc/", "C:\\", "\\\\"]
-
         for node_id, node_data in workflow.items():
             inputs = node_data.get("inputs", {})
 
             # Check model-related inputs
-            for key in [
+            for key in (
                 "ckpt_name",
                 "lora_name",
                 "vae_name",
                 "model_name",
                 "control_net_name",
-            ]:
+            ):
                 if key in inputs:
                     path = inputs[key]
                     if isinstance(path, str):
-                        for pattern in dangerous_patterns:
-                            if pattern in path:
-                                errors.append(
-                                    f"Node {node_id}: Invalid path in '{key}' "
-                                    f"(security risk: contains '{pattern}')"
-                                )
-                                break
+                        match = _UNSAFE_PATH.search(path)
+                        if match:
+                            errors.append(
+                                f"Node {node_id}: Invalid path in '{key}' "
+                                f"(security risk: contains {match.group(0)!r})"
+                            )
 
     def _calculate_complexity(self, workflow: dict[str, Any]) -> dict[str, Any]:
         """Calculate workflow complexity.
@@ -417,17 +455,15 @@ class WorkflowValidator:
         """
         node_count = len(workflow)
 
-        # Count connections
+        # One pass gathers both counts; the score is then flat integer
+        # arithmetic instead of a second and third graph walk
         connection_count = 0
+        custom_count = 0
         for node_data in workflow.values():
-            inputs = node_data.get("inputs", {})
-            for input_value in inputs.values():
+            for input_value in node_data.get("inputs", {}).values():
                 if isinstance(input_value, list) and len(input_value) == 2:
                     connection_count += 1
 
-        # Count custom nodes
-        custom_count = 0
-        for node_data in workflow.values():
             class_type = node_data.get("class_type", "")
             if class_type and class_type not in BUILTIN_NODES:
                 custom_count += 1
@@ -450,3 +486,130 @@ class WorkflowValidator:
             "connections": connection_count,
             "custom_nodes": custom_count,
         }
+
+
+@lru_cache(maxsize=None)
+def _required_inputs(class_type: str) -> frozenset[str]:
+    """Resolve the required-input schema for a node class, cached.
+
+    The frozenset is built once per class_type for the process lifetime,
+    so repeated validations pay a single dict hit and get O(1)
+    membership and set-difference against a node's inputs.
+
+    Args:
+        class_type: Node class type
+
+    Returns:
+        Frozen set of required input names (empty for unknown nodes)
+    """
+    return frozenset(WorkflowValidator.REQUIRED_INPUTS.get(class_type, ()))
+
+
+def _tarjan_sccs(adj: list[list[int]]) -> list[list[int]]:
+    """Enumerate strongly connected components of an integer digraph.
+
+    Iterative Tarjan with an explicit (vertex, next-child) work stack:
+    one O(V+E) pass, no recursion, bounded auxiliary lists indexed by
+    vertex.
+
+    Args:
+        adj: Adjacency lists over vertices 0..len(adj)-1
+
+    Returns:
+        List of components, each a list of vertex indices
+    """
+    n = len(adj)
+    index_of = [-1] * n
+    lowlink = [0] * n
+    on_stack = [False] * n
+    scc_stack: list[int] = []
+    sccs: list[list[int]] = []
+    counter = 0
+
+    for root in range(n):
+        if index_of[root] != -1:
+            continue
+        work: list[tuple[int, int]] = [(root, 0)]
+        while work:
+            u, child = work.pop()
+            if child == 0:
+                index_of[u] = lowlink[u] = counter
+                counter += 1
+                scc_stack.append(u)
+                on_stack[u] = True
+
+            descended = False
+            children = adj[u]
+            while child < len(children):
+                v = children[child]
+                child += 1
+                if index_of[v] == -1:
+                    work.append((u, child))
+                    work.append((v, 0))
+                    descended = True
+                    break
+                if on_stack[v] and index_of[v] < lowlink[u]:
+                    lowlink[u] = index_of[v]
+            if descended:
+                continue
+
+            if lowlink[u] == index_of[u]:
+                component = []
+                while True:
+                    w = scc_stack.pop()
+                    on_stack[w] = False
+                    component.append(w)
+                    if w == u:
+                        break
+                sccs.append(component)
+
+            if work:
+                parent = work[-1][0]
+                if lowlink[u] < lowlink[parent]:
+                    lowlink[parent] = lowlink[u]
+
+    return sccs
+
+
+def _check_empty_latent_image(node_id: str, inputs: dict[str, Any]) -> list[str]:
+    """Strict type checks for EmptyLatentImage inputs.
+
+    Straight-line checks specialized for this node type — the dispatch
+    table plays the role a compiled per-schema validator would, without
+    pulling in a schema-compiler dependency for a handful of fields.
+
+    Args:
+        node_id: Node identifier
+        inputs: Node inputs dictionary
+
+    Returns:
+        List of error strings (empty if all inputs are valid)
+    """
+    errors = []
+    for field_name in ("width", "height", "batch_size"):
+        # Absent fields fall back to node defaults; an explicit null
+        # does not, so it must still be flagged below
+        if field_name not in inputs:
+            continue
+        value = inputs[field_name]
+        if isinstance(value, int | float):
+            continue
+        # Connection-valued inputs ([node_id, output_index]) are typed
+        # by the producing node, not literally — leave them to the
+        # connection checks
+        if isinstance(value, list) and len(value) == 2:
+            continue
+        errors.append(
+            f"Node {node_id}: Input '{field_name}' has invalid type "
+            f"(expected number, got {type(value).__name__})"
+        )
+    return errors
+
+
+# class_type -> strict checker dispatch table, built once at import.
+# Adding strict validation for another node type is one entry here.
+# Keys are interned to match the interned class_type strings stamped
+# in validate(), so dispatch hits resolve by pointer identity.
+_STRICT_CHECKERS: dict[str, Callable[[str, dict[str, Any]], list[str]]] = {
+    sys.intern("EmptyLatentImage"): _check_empty_latent_image,
+}
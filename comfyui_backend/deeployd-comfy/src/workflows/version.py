@@ -1,13 +1,15 @@
 """Version management for ComfyUI workflows."""
 
 import hashlib
-import json
+import time
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any
 
+import orjson
 
-@dataclass
+
+@dataclass(slots=True)
 class WorkflowVersion:
     """Represents a version of a workflow."""
 
@@ -16,25 +18,29 @@ class WorkflowVersion:
     message: str = ""
     hash: str | None = None
     parent_hash: str | None = None
-    timestamp: datetime | None = None
+    # Wall-clock nanoseconds: creation is one clock read, ordering is
+    # an integer compare, and the datetime object only materializes on
+    # serialization via the `timestamp` property
+    timestamp_ns: int = 0
     tags: list[str] = field(default_factory=list)
 
     def __post_init__(self):
         """Initialize computed fields after dataclass init."""
         if self.hash is None:
-            self.hash = self._generate_hash()
-        if self.timestamp is None:
-            self.timestamp = datetime.now()
-
-    def _generate_hash(self) -> str:
-        """Generate SHA-1 hash of workflow content.
-
-        Returns:
-            40-character hex hash string
-        """
-        # Create stable JSON representation
-        workflow_json = json.dumps(self.workflow, sort_keys=True)
-        return hashlib.sha256(workflow_json.encode()).hexdigest()
+            # One canonical serialization serves both purposes: the
+            # digest, and a detached snapshot so later caller-side
+            # mutations of the dict cannot corrupt this version. The
+            # orjson round-trip is a C-speed deep copy.
+            canonical = orjson.dumps(self.workflow, option=orjson.OPT_SORT_KEYS)
+            self.hash = hashlib.blake2b(canonical, digest_size=20).hexdigest()
+            self.workflow = orjson.loads(canonical)
+        if self.timestamp_ns == 0:
+            self.timestamp_ns = time.time_ns()
+
+    @property
+    def timestamp(self) -> datetime:
+        """Creation time as a datetime, derived from the stored integer."""
+        return datetime.fromtimestamp(self.timestamp_ns / 1e9)
 
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary representation.
@@ -48,7 +54,7 @@ class WorkflowVersion:
             "message": self.message,
             "hash": self.hash,
             "parent_hash": self.parent_hash,
-            "timestamp": self.timestamp.isoformat() if self.timestamp else None,
+            "timestamp": self.timestamp.isoformat(),
             "tags": self.tags,
         }
 
@@ -62,9 +68,11 @@ class WorkflowVersion:
         Returns:
             WorkflowVersion instance
         """
-        timestamp = None
+        timestamp_ns = 0
         if data.get("timestamp"):
-            timestamp = datetime.fromisoformat(data["timestamp"])
+            timestamp_ns = int(
+                datetime.fromisoformat(data["timestamp"]).timestamp() * 1e9
+            )
 
         return cls(
             workflow=data["workflow"],
@@ -72,7 +80,7 @@ class WorkflowVersion:
             message=data.get("message", ""),
             hash=data.get("hash"),
             parent_hash=data.get("parent_hash"),
-            timestamp=timestamp,
+            timestamp_ns=timestamp_ns,
             tags=data.get("tags", []),
         )
 
@@ -87,9 +95,27 @@ class VersionManager:
         self.tags: dict[str, str] = {}  # tag -> hash mapping
         self.branches: dict[str, list[WorkflowVersion]] = {"main": []}
         self.current_branch: str = "main"
+        # O(1) lookup indices maintained by add_version/import;
+        # get_version never scans the history list
+        self._by_hash: dict[str, WorkflowVersion] = {}
+        self._by_version: dict[str, WorkflowVersion] = {}
+        # id(snapshot) -> (snapshot, digest), holding ONLY detached
+        # snapshots this manager created itself. A caller's live dict
+        # never enters the cache: its digest would silently go stale on
+        # the next mutation, and there is no way to detect that short
+        # of re-serializing — which is the work the cache exists to
+        # skip. Snapshot digests can never go stale, so a hit (e.g. a
+        # checkout -> commit flow re-submitting version.workflow) can
+        # safely skip both the hash and the re-snapshot. The tuple's
+        # strong reference keeps the keyed id from being recycled.
+        self._hash_cache: dict[int, tuple[dict[str, Any], str]] = {}
 
     def add_version(
-        self, workflow: dict[str, Any], message: str, version: str | None = None
+        self,
+        workflow: dict[str, Any],
+        message: str,
+        version: str | None = None,
+        dedup: bool = False,
     ) -> WorkflowVersion:
         """Add a new version to the history.
 
@@ -97,10 +123,32 @@ class VersionManager:
             workflow: Workflow dictionary
             message: Commit message
             version: Optional version string (auto-generated if None)
+            dedup: If True, return the existing version when a version
+                with identical content is already in the history instead
+                of appending a duplicate entry
 
         Returns:
-            Created WorkflowVersion
+            Created (or existing, when dedup hits) WorkflowVersion
         """
+        if dedup:
+            cached = self._hash_cache.get(id(workflow))
+            if cached is not None:
+                content_hash = cached[1]
+            else:
+                # One canonical pass serves both the dedup probe and,
+                # on a miss, the detached snapshot for the new version
+                canonical = orjson.dumps(workflow, option=orjson.OPT_SORT_KEYS)
+                content_hash = hashlib.blake2b(canonical, digest_size=20).hexdigest()
+            existing = self._by_hash.get(content_hash)
+            if existing is not None:
+                return existing
+            if cached is None:
+                # Detach here so what flows into the version — and
+                # into the cache below — is the snapshot, never the
+                # caller's live dict
+                workflow = orjson.loads(canonical)
+                self._hash_cache[id(workflow)] = (workflow, content_hash)
+
         if version is None:
             version = self._generate_next_version()
 
@@ -108,12 +156,27 @@ class VersionManager:
         if self.versions and self.current_index >= 0:
             parent_hash = self.versions[self.current_index].hash
 
+        # A cache hit means `workflow` is itself one of our detached
+        # snapshots, so its digest is current and __post_init__ may
+        # skip re-snapshotting it. A miss means a live caller dict:
+        # pass hash=None and let __post_init__ hash and detach it.
+        cached = self._hash_cache.get(id(workflow))
         new_version = WorkflowVersion(
-            workflow=workflow, version=version, message=message, parent_hash=parent_hash
+            workflow=workflow,
+            version=version,
+            message=message,
+            parent_hash=parent_hash,
+            hash=cached[1] if cached is not None else None,
+        )
+        self._hash_cache[id(new_version.workflow)] = (
+            new_version.workflow,
+            new_version.hash,  # type: ignore[has-type]
         )
 
         self.versions.append(new_version)
         self.current_index = len(self.versions) - 1
+        self._by_hash[new_version.hash] = new_version  # type: ignore[index]
+        self._by_version[new_version.version] = new_version
 
         # Add to current branch
         self.branches[self.current_branch].append(new_version)
@@ -153,16 +216,9 @@ class VersionManager:
         Returns:
             WorkflowVersion if found, None otherwise
         """
-        # Check if it's a tag
-        if identifier in self.tags:
-            identifier = self.tags[identifier]
-
-        # Search by hash or version string
-        for version in self.versions:
-            if version.hash == identifier or version.version == identifier:
-                return version
-
-        return None
+        # Resolve tag aliases, then hit the hash and version indices
+        identifier = self.tags.get(identifier, identifier)
+        return self._by_hash.get(identifier) or self._by_version.get(identifier)
 
     def get_latest(self) -> WorkflowVersion | None:
         """Get the latest version.
@@ -198,7 +254,9 @@ class VersionManager:
         Returns:
             List of versions from newest to oldest
         """
-        return list(reversed(self.versions))
+        # Integer-key sort: correct even after imports interleave
+        # histories, and cheaper than comparing ISO strings
+        return sorted(self.versions, key=lambda v: v.timestamp_ns, reverse=True)
 
     def get_diff(self, hash1: str, hash2: str) -> dict[str, Any]:
         """Get differences between two versions.
@@ -216,32 +274,20 @@ class VersionManager:
         if not v1 or not v2:
             return {"error": "Version not found"}
 
-        diff = {
-            "added": {},
-            "removed": {},
-            "modified": {},
-        }
-
-        w1_keys = set(v1.workflow.keys())
-        w2_keys = set(v2.workflow.keys())
-
-        # Added nodes
-        for key in w2_keys - w1_keys:
-            diff["added"][key] = v2.workflow[key]
-
-        # Removed nodes
-        for key in w1_keys - w2_keys:
-            diff["removed"][key] = v1.workflow[key]
+        # Set algebra directly on the dict key views — no intermediate
+        # set() copies, and only the intersection loop touches Python
+        w1, w2 = v1.workflow, v2.workflow
+        w1_keys, w2_keys = w1.keys(), w2.keys()
 
-        # Modified nodes
-        for key in w1_keys & w2_keys:
-            if v1.workflow[key] != v2.workflow[key]:
-                diff["modified"][key] = {
-                    "old": v1.workflow[key],
-                    "new": v2.workflow[key],
-                }
-
-        return diff
+        return {
+            "added": {key: w2[key] for key in w2_keys - w1_keys},
+            "removed": {key: w1[key] for key in w1_keys - w2_keys},
+            "modified": {
+                key: {"old": w1[key], "new": w2[key]}
+                for key in w1_keys & w2_keys
+                if w1[key] != w2[key]
+            },
+        }
 
     def checkout(self, identifier: str) -> bool:
         """Checkout a specific version.
@@ -331,8 +377,10 @@ class VersionManager:
             "current_branch": self.current_branch,
         }
 
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, default=str)
+        # orjson serializes the whole history in C; timestamps are
+        # already ISO strings via to_dict()
+        with open(filepath, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
 
     def import_from_file(self, filepath: str):
         """Import version history from file.
@@ -340,10 +388,12 @@ class VersionManager:
         Args:
             filepath: Path to import file
         """
-        with open(filepath, encoding="utf-8") as f:
-            data = json.load(f)
+        with open(filepath, "rb") as f:
+            data = orjson.loads(f.read())
 
         self.versions = [WorkflowVersion.from_dict(v) for v in data["versions"]]
+        self._by_hash = {v.hash: v for v in self.versions}  # type: ignore[misc]
+        self._by_version = {v.version: v for v in self.versions}
         self.tags = data.get("tags", {})
         self.current_index = data.get("current_index", -1)
         self.current_branch = data.get("current_branch", "main")
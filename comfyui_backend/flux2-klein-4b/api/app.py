@@ -1,37 +1,63 @@
+import importlib
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-import os
 
 # Determine which router to use based on environment variable
 USE_PARALLEL_ROUTER = os.getenv("USE_PARALLEL_ROUTER", "true").lower() == "true"
 
-if USE_PARALLEL_ROUTER:
-    from src.router_parallel import router
-else:
-    from src.router import router
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Import the router (and its heavy model dependencies) only after
+    # the ASGI loop is up, shortening worker cold-start
+    router_module = importlib.import_module(
+        "src.router_parallel" if USE_PARALLEL_ROUTER else "src.router"
+    )
+    app.include_router(router_module.router)
+    yield
+
 
 app = FastAPI(
     title="Flux2 Image Generation API",
     description="Advanced image generation with Flux2 model supporting text-to-image and multi-reference image editing (0-10 reference images)",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins="*",
-    allow_credentials=True,
+    # Wildcard origins must be a list, and credentials are disabled so
+    # Starlette can answer with the cheap static "*" header instead of
+    # echoing each request's origin
+    allow_origins=["*"],
+    allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-app.include_router(
-    router=router,
-)
-
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app="app:app", host="0.0.0.0", port=5050, reload=False)
+    try:
+        import httptools  # noqa: F401
+        import uvloop  # noqa: F401
+
+        loop, http = "uvloop", "httptools"
+    except ImportError:
+        loop, http = "auto", "auto"
+
+    uvicorn.run(
+        app="app:app",
+        host="0.0.0.0",
+        port=5050,
+        reload=False,
+        loop=loop,
+        http=http,
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+    )
@@ -1,12 +1,13 @@
 # src/comfy.py
 
 import os
-import json
-import requests
+import orjson
+import aiohttp
 import asyncio
 import base64
-import uuid
+import hashlib
 import io
+import uuid
 from typing import List, Optional
 from PIL import Image
 from dotenv import load_dotenv
@@ -14,8 +15,84 @@ from config import COMFYUI_SERVER, COMFYUI_OUTPUT_DIR, COMFYUI_INPUT_DIR
 
 load_dotenv()
 
+# Shared aiohttp session: created lazily on the running loop, reused
+# across all polls and submissions so keep-alive connections are pooled
+# instead of paying a TCP handshake per request.
+_session: Optional[aiohttp.ClientSession] = None
+
+
+async def get_client_session() -> aiohttp.ClientSession:
+    """Return the shared aiohttp session, creating it on first use."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=10),
+        )
+    return _session
+
+
+_PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+
+def _temp_path(filepath: str) -> str:
+    """Unique temp name next to the final path, so os.replace is atomic."""
+    return f"{filepath}.{uuid.uuid4().hex}.tmp"
+
+
+def _save_raw_png(image_data: bytes, filepath: str, index: int, filename: str):
+    """Write bytes that are already PNG straight to disk, no re-encode.
+
+    Writes go to a temp name first and os.replace into place: the
+    content-addressed path only ever holds a complete file, and
+    concurrent saves of the same digest cannot interleave.
+    """
+    tmp_path = _temp_path(filepath)
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(image_data)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    print(f"Saved reference image {index} to: {filename} (already PNG, no re-encode)")
+
+
+def _decode_and_save_png(image_data: bytes, filepath: str, index: int, filename: str):
+    """Decode raw image bytes with PIL and write a PNG.
 
-def save_reference_image(image_input: str, index: int) -> str:
+    Blocking CPU work — runs in a worker thread via asyncio.to_thread so
+    one image's decode overlaps another's network fetch. The encode
+    lands on a temp name and is os.replace'd into the final
+    content-addressed path so a crash mid-write never leaves a
+    truncated file that later requests would treat as a cache hit.
+    """
+    tmp_path = _temp_path(filepath)
+    try:
+        img = Image.open(io.BytesIO(image_data))
+        # Convert to RGB if necessary (handles RGBA, P mode, etc.)
+        if img.mode in ('RGBA', 'LA', 'P'):
+            # Preserve alpha if present
+            img = img.convert('RGBA')
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+        # Save as PNG
+        img.save(tmp_path, format='PNG')
+        os.replace(tmp_path, filepath)
+        print(f"Saved reference image {index} to: {filename} (converted from {img.format or 'unknown'} to PNG)")
+    except Exception as img_err:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        print(f"Error processing image {index}: {img_err}")
+        raise ValueError(f"Invalid or corrupted image data for reference image {index}: {img_err}")
+
+
+async def save_reference_image(image_input: str, index: int) -> str:
     """Save an image to the input directory and return the filename.
 
     Supports:
@@ -23,19 +100,19 @@ def save_reference_image(image_input: str, index: int) -> str:
     - URL paths (starting with http://, https://, or /api/)
 
     The image is always converted to PNG format to ensure compatibility.
-    """
-    # Generate unique filename
-    filename = f"ref_{uuid.uuid4().hex}_{index}.png"
-    filepath = os.path.join(COMFYUI_INPUT_DIR, filename)
+    Fetches go through the shared aiohttp session and the PIL work runs
+    in a thread, so multiple references ingest concurrently.
 
+    Files are content-addressed by a digest of the raw input bytes, so
+    re-uploads of the same image across requests skip the decode and
+    PNG re-encode entirely and reuse the file already on disk.
+    """
     try:
         # Check if input is a URL (http://, https://, or relative /api/ path)
         if image_input.startswith(('http://', 'https://')):
             # Absolute URL - fetch directly
             print(f"Fetching reference image {index} from URL: {image_input}")
-            response = requests.get(image_input, timeout=30)
-            response.raise_for_status()
-            image_data = response.content
+            full_url = image_input
         elif image_input.startswith('/api/'):
             # Relative API path - need to fetch from the main app server
             # This is typically served by the Next.js frontend
@@ -43,9 +120,16 @@ def save_reference_image(image_input: str, index: int) -> str:
             base_url = os.environ.get('FRONTEND_URL', 'http://host.docker.internal:3000')
             full_url = f"{base_url}{image_input}"
             print(f"Fetching reference image {index} from: {full_url}")
-            response = requests.get(full_url, timeout=30)
-            response.raise_for_status()
-            image_data = response.content
+        else:
+            full_url = None
+
+        if full_url is not None:
+            session = await get_client_session()
+            async with session.get(
+                full_url, timeout=aiohttp.ClientTimeout(total=30)
+            ) as response:
+                response.raise_for_status()
+                image_data = await response.read()
         else:
             # Assume base64-encoded data
             # Handle data URI format if present
@@ -53,25 +137,30 @@ def save_reference_image(image_input: str, index: int) -> str:
                 image_input = image_input.split(",")[1]
             image_data = base64.b64decode(image_input)
 
+        # Content-addressed filename: identical input bytes map to the
+        # same file, turning repeat uploads into a cache hit
+        digest = hashlib.blake2b(image_data, digest_size=16).hexdigest()
+        filename = f"ref_{digest}.png"
+        filepath = os.path.join(COMFYUI_INPUT_DIR, filename)
+
+        if os.path.exists(filepath):
+            # Refresh mtime so LRU eviction sees this file as in use
+            os.utime(filepath)
+            print(f"Reference image {index} already cached as {filename}, skipping re-encode")
+            return filename
+
+        if image_data[:8] == _PNG_MAGIC:
+            # Frontends commonly upload PNG already — write the raw
+            # bytes and skip the PIL decode/encode entirely
+            await asyncio.to_thread(_save_raw_png, image_data, filepath, index, filename)
+            return filename
+
         # Validate and convert image to PNG format
         # This handles JPEG, WEBP, GIF, BMP, etc. and ensures valid PNG output
-        try:
-            img = Image.open(io.BytesIO(image_data))
-            # Convert to RGB if necessary (handles RGBA, P mode, etc.)
-            if img.mode in ('RGBA', 'LA', 'P'):
-                # Preserve alpha if present
-                img = img.convert('RGBA')
-            elif img.mode != 'RGB':
-                img = img.convert('RGB')
-            # Save as PNG
-            img.save(filepath, format='PNG')
-            print(f"Saved reference image {index} to: {filename} (converted from {img.format or 'unknown'} to PNG)")
-        except Exception as img_err:
-            print(f"Error processing image {index}: {img_err}")
-            raise ValueError(f"Invalid or corrupted image data for reference image {index}: {img_err}")
+        await asyncio.to_thread(_decode_and_save_png, image_data, filepath, index, filename)
 
         return filename
-    except requests.exceptions.RequestException as e:
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         print(f"Error fetching reference image {index}: {e}")
         raise ValueError(f"Failed to fetch reference image {index} from URL: {e}")
     except ValueError:
@@ -82,7 +171,7 @@ def save_reference_image(image_input: str, index: int) -> str:
         raise ValueError(f"Failed to decode and save reference image {index}: {e}")
 
 
-def modify_workflow(
+async def modify_workflow(
     workflow_data,
     prompt: str,
     width: int,
@@ -102,29 +191,37 @@ def modify_workflow(
     - Image editing (with reference_images): Dimensions derived from reference images via
       LoadImage -> ImageScaleToTotalPixels -> VAEEncode -> ReferenceLatent chain
     """
-    workflow = json.loads(json.dumps(workflow_data))
+    # orjson round-trip is a C-speed deep copy of the JSON-shaped
+    # template — no Python-level encoder/decoder walk per request
+    workflow = orjson.loads(orjson.dumps(workflow_data))
     is_edit_mode = reference_images and len(reference_images) > 0
 
+    # Validate every fixed node the template must provide up front, so
+    # the injections below are plain dict stores with no per-node guards
+    required_nodes = {
+        "6": "prompt",
+        "25": "seed",
+        "22": "CFGGuider",
+        "47": "dimensions",
+        "48": "scheduler settings",
+    }
+    for node_id, purpose in required_nodes.items():
+        if node_id not in workflow or "inputs" not in workflow[node_id]:
+            raise ValueError(
+                f"Workflow configuration error: Node {node_id} structure invalid for {purpose}."
+            )
+
     # Node 6 - CLIP Text Encode (Positive Prompt)
-    if "6" in workflow and "inputs" in workflow["6"]:
-        workflow["6"]["inputs"]["text"] = prompt
-        print(f"Injected prompt into node 6")
-    else:
-        raise ValueError("Workflow configuration error: Node 6 structure invalid for prompt.")
+    workflow["6"]["inputs"]["text"] = prompt
+    print(f"Injected prompt into node 6")
 
     # Node 25 - RandomNoise (seed)
-    if "25" in workflow and "inputs" in workflow["25"]:
-        workflow["25"]["inputs"]["noise_seed"] = seed_value
-        print(f"Injected seed {seed_value} into node 25")
-    else:
-        raise ValueError("Workflow configuration error: Node 25 structure invalid for seed.")
+    workflow["25"]["inputs"]["noise_seed"] = seed_value
+    print(f"Injected seed {seed_value} into node 25")
 
     # Node 22 - CFGGuider (guidance scale via 'cfg' parameter)
-    if "22" in workflow and "inputs" in workflow["22"]:
-        workflow["22"]["inputs"]["cfg"] = guidance
-        print(f"Injected guidance {guidance} into node 22 (CFGGuider)")
-    else:
-        raise ValueError("Workflow configuration error: Node 22 structure invalid for CFGGuider.")
+    workflow["22"]["inputs"]["cfg"] = guidance
+    print(f"Injected guidance {guidance} into node 22 (CFGGuider)")
 
     # Handle reference images (0-10 supported) with dynamic ReferenceLatent chain
     saved_filenames = []
@@ -135,26 +232,34 @@ def modify_workflow(
         # 2. EmptyFlux2LatentImage is still used (not the VAE encoded reference) with reference dimensions
         print(f"Image editing mode: Processing {len(reference_images)} reference image(s)")
 
+        if len(reference_images) > 10:
+            print(f"Warning: Maximum 10 reference images supported, ignoring extra images")
+
+        # Ingest all references concurrently: network fetches interleave
+        # and PIL decodes run in threads, so total latency tracks the
+        # slowest image instead of the sum of all of them
+        saved_filenames = list(
+            await asyncio.gather(
+                *(
+                    save_reference_image(img_base64, idx)
+                    for idx, img_base64 in enumerate(reference_images[:10])
+                )
+            )
+        )
+
         prev_pos_cond = "6"  # Start from CLIPTextEncode (positive prompt)
         prev_neg_cond = "7"  # Start from CLIPTextEncode (negative prompt)
         first_vae_encode_node = None
         first_scale_node_id = None
 
-        for idx, img_base64 in enumerate(reference_images):
-            if idx >= 10:
-                print(f"Warning: Maximum 10 reference images supported, ignoring extra images")
-                break
-
-            # Save the image and get the filename
-            filename = save_reference_image(img_base64, idx)
-            saved_filenames.append(filename)
-
-            # Define node IDs for this reference image
-            load_node_id = str(200 + idx * 10)           # 200, 210, 220...
-            scale_node_id = str(201 + idx * 10)          # 201, 211, 221...
-            vae_node_id = str(202 + idx * 10)            # 202, 212, 222...
-            ref_pos_node_id = str(203 + idx * 10)        # 203, 213, 223... (positive)
-            ref_neg_node_id = str(204 + idx * 10)        # 204, 214, 224... (negative)
+        for idx, filename in enumerate(saved_filenames):
+            # Define node IDs for this reference image from one base
+            base = 200 + idx * 10
+            load_node_id = str(base)                     # 200, 210, 220...
+            scale_node_id = str(base + 1)                # 201, 211, 221...
+            vae_node_id = str(base + 2)                  # 202, 212, 222...
+            ref_pos_node_id = str(base + 3)              # 203, 213, 223... (positive)
+            ref_neg_node_id = str(base + 4)              # 204, 214, 224... (negative)
 
             # Add LoadImage node
             workflow[load_node_id] = {
@@ -234,17 +339,15 @@ def modify_workflow(
 
         # Node 47 - EmptyFlux2LatentImage: Use dimensions from GetImageSize (NOT from VAE encode)
         # The sampler still uses EmptyFlux2LatentImage, dimensions come from reference
-        if "47" in workflow and "inputs" in workflow["47"]:
-            workflow["47"]["inputs"]["width"] = [get_size_node_id, 0]
-            workflow["47"]["inputs"]["height"] = [get_size_node_id, 1]
-            print(f"EmptyFlux2LatentImage (47) now uses dimensions from GetImageSize")
+        workflow["47"]["inputs"]["width"] = [get_size_node_id, 0]
+        workflow["47"]["inputs"]["height"] = [get_size_node_id, 1]
+        print(f"EmptyFlux2LatentImage (47) now uses dimensions from GetImageSize")
 
         # Node 48 - Flux2Scheduler: Use dimensions from GetImageSize
-        if "48" in workflow and "inputs" in workflow["48"]:
-            workflow["48"]["inputs"]["steps"] = steps
-            workflow["48"]["inputs"]["width"] = [get_size_node_id, 0]
-            workflow["48"]["inputs"]["height"] = [get_size_node_id, 1]
-            print(f"Flux2Scheduler (48) steps={steps}, dimensions from GetImageSize")
+        workflow["48"]["inputs"]["steps"] = steps
+        workflow["48"]["inputs"]["width"] = [get_size_node_id, 0]
+        workflow["48"]["inputs"]["height"] = [get_size_node_id, 1]
+        print(f"Flux2Scheduler (48) steps={steps}, dimensions from GetImageSize")
 
     else:
         # TEXT-TO-IMAGE MODE: Use user-specified dimensions
@@ -254,36 +357,37 @@ def modify_workflow(
         workflow["22"]["inputs"]["positive"] = ["6", 0]
 
         # Node 47 - EmptyFlux2LatentImage (dimensions)
-        if "47" in workflow and "inputs" in workflow["47"]:
-            workflow["47"]["inputs"]["width"] = width
-            workflow["47"]["inputs"]["height"] = height
-            print(f"Injected dimensions {width}x{height} into node 47")
-        else:
-            raise ValueError("Workflow configuration error: Node 47 structure invalid for dimensions.")
+        workflow["47"]["inputs"]["width"] = width
+        workflow["47"]["inputs"]["height"] = height
+        print(f"Injected dimensions {width}x{height} into node 47")
 
         # Node 48 - Flux2Scheduler (steps and dimensions for scheduler)
-        if "48" in workflow and "inputs" in workflow["48"]:
-            workflow["48"]["inputs"]["steps"] = steps
-            workflow["48"]["inputs"]["width"] = width
-            workflow["48"]["inputs"]["height"] = height
-            print(f"Injected steps {steps} and dimensions {width}x{height} into node 48")
-        else:
-            raise ValueError("Workflow configuration error: Node 48 structure invalid for scheduler settings.")
+        workflow["48"]["inputs"]["steps"] = steps
+        workflow["48"]["inputs"]["width"] = width
+        workflow["48"]["inputs"]["height"] = height
+        print(f"Injected steps {steps} and dimensions {width}x{height} into node 48")
 
     return workflow, saved_filenames
 
 
 async def poll_for_result(prompt_id):
-    """Poll ComfyUI for the result of a submitted workflow."""
-    max_attempts = 120
-    poll_interval = 3
+    """Poll ComfyUI for the result of a submitted workflow.
+
+    Uses exponential backoff (250ms up to a 2s cap) instead of a fixed
+    3s interval, so fast generations return almost immediately while
+    long ones converge to the same steady-state poll rate.
+    """
+    max_attempts = 180
+    delay = 0.25
+    max_delay = 2.0
 
     print(f"Polling for result for prompt_id: {prompt_id}...")
+    session = await get_client_session()
     for attempt in range(max_attempts):
         try:
-            response = requests.get(f"{COMFYUI_SERVER}/history/{prompt_id}", timeout=10)
-            response.raise_for_status()
-            history = response.json()
+            async with session.get(f"{COMFYUI_SERVER}/history/{prompt_id}") as response:
+                response.raise_for_status()
+                history = await response.json()
 
             if prompt_id in history:
                 prompt_data = history[prompt_id]
@@ -302,15 +406,15 @@ async def poll_for_result(prompt_id):
                                 output_filename = image_data["filename"]
                                 output_path_container = os.path.join(COMFYUI_OUTPUT_DIR, output_filename)
 
-                                # Add delay to ensure file is fully written and synced
+                                # Spin at 50ms granularity until the file
+                                # lands on disk — returns the moment it
+                                # appears instead of sleeping in 0.5s steps
                                 print(f"Image {output_filename} reported in outputs, waiting for file sync...")
-                                for i in range(10):  # Try up to 10 times with 0.5 second intervals
-                                    await asyncio.sleep(0.5)
+                                for i in range(100):
                                     if os.path.exists(output_path_container):
-                                        # File exists, wait a bit more to ensure it's fully written
-                                        await asyncio.sleep(0.5)
-                                        print(f"Found output image: {output_filename} after {i+1} attempts")
+                                        print(f"Found output image: {output_filename} after {(i + 1) * 0.05:.2f}s")
                                         return output_path_container
+                                    await asyncio.sleep(0.05)
                                 print(f"File {output_filename} reported but not yet on disk. Will retry.")
 
                     # Fallback: Check all outputs for any image node
@@ -340,9 +444,9 @@ async def poll_for_result(prompt_id):
             else:
                 # Check if it's still in the queue
                 try:
-                    queue_response = requests.get(f"{COMFYUI_SERVER}/queue", timeout=5)
-                    queue_response.raise_for_status()
-                    queue_data = queue_response.json()
+                    async with session.get(f"{COMFYUI_SERVER}/queue") as queue_response:
+                        queue_response.raise_for_status()
+                        queue_data = await queue_response.json()
                     queued_prompts = [
                         item[1]
                         for item in queue_data.get("queue_running", [])
@@ -358,25 +462,61 @@ async def poll_for_result(prompt_id):
                 except Exception as qe:
                     print(f"Warning: Error checking queue status: {qe}")
 
-        except requests.exceptions.RequestException as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             print(f"Warning: Poll attempt {attempt + 1} failed - connection error: {e}")
         except Exception as e:
             print(f"Warning: Poll attempt {attempt + 1} failed - unexpected error: {e}")
             import traceback
             print(traceback.format_exc())
 
-        await asyncio.sleep(poll_interval)
+        await asyncio.sleep(delay)
+        delay = min(delay * 1.5, max_delay)
 
     raise TimeoutError(f"Timeout waiting for image processing results for prompt_id: {prompt_id} after {max_attempts} attempts.")
 
 
+# Size budget for the content-addressed reference cache
+_REF_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
 def cleanup_reference_images(filenames: List[str]):
-    """Clean up saved reference images after processing."""
-    for filename in filenames:
-        filepath = os.path.join(COMFYUI_INPUT_DIR, filename)
-        try:
-            if os.path.exists(filepath):
-                os.remove(filepath)
-                print(f"Cleaned up reference image: {filename}")
-        except OSError as e:
-            print(f"Warning: Could not remove reference image {filename}: {e}")
+    """Bound the reference-image cache after processing.
+
+    Reference files are content-addressed and shared across requests,
+    so deleting them per-job would defeat the cache (and could race a
+    concurrent job using the same reference). Instead, when the cache
+    exceeds its size budget, evict oldest-mtime files until it fits.
+
+    Args:
+        filenames: Files used by the finished job (kept for the caller
+            interface; eviction considers the whole cache directory)
+    """
+    try:
+        entries = []
+        total_size = 0
+        for name in os.listdir(COMFYUI_INPUT_DIR):
+            if not name.startswith("ref_"):
+                continue
+            path = os.path.join(COMFYUI_INPUT_DIR, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_size += stat.st_size
+
+        if total_size <= _REF_CACHE_MAX_BYTES:
+            return
+
+        entries.sort()  # oldest mtime first
+        for _mtime, size, path in entries:
+            try:
+                os.remove(path)
+                total_size -= size
+                print(f"Evicted cached reference image: {os.path.basename(path)}")
+            except OSError as e:
+                print(f"Warning: Could not remove reference image {path}: {e}")
+            if total_size <= _REF_CACHE_MAX_BYTES:
+                break
+    except OSError as e:
+        print(f"Warning: Reference cache cleanup failed: {e}")
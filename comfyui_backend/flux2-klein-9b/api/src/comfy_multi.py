@@ -7,11 +7,24 @@ import asyncio
 import random
 import time
 from typing import List, Optional, Dict, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from config import COMFYUI_SERVER, COMFYUI_OUTPUT_DIR
 
 # Track which instance is handling each prompt
 prompt_to_instance: Dict[str, str] = {}
 
+# Module-level session: keep-alive reuses TCP connections across the
+# ~40 polls a generation makes instead of handshaking per call
+_session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=64,
+    max_retries=Retry(total=2, backoff_factor=0.2),
+)
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+
 def get_comfyui_servers() -> List[str]:
     """Get list of ComfyUI servers from environment"""
     servers_env = os.getenv('COMFYUI_SERVERS', COMFYUI_SERVER)
@@ -35,7 +48,7 @@ def submit_prompt_to_server(server: str, workflow: dict) -> Tuple[str, str]:
     prompt_id = str(random.randint(0, 2**32))
     
     try:
-        response = requests.post(
+        response = _session.post(
             f"{server}/prompt",
             json={"prompt": workflow},
             timeout=30
@@ -74,7 +87,7 @@ async def poll_for_result_multi(prompt_id: str):
         for check_server in servers:
             try:
                 # Check history
-                response = requests.get(f"{check_server}/history/{prompt_id}", timeout=10)
+                response = _session.get(f"{check_server}/history/{prompt_id}", timeout=10)
                 response.raise_for_status()
                 history = response.json()
                 
@@ -110,7 +123,7 @@ async def poll_for_result_multi(prompt_id: str):
                                         print(f"File {output_filename} not yet on disk, retrying...")
                 
                 # Also check queue
-                queue_response = requests.get(f"{check_server}/queue", timeout=10)
+                queue_response = _session.get(f"{check_server}/queue", timeout=10)
                 if queue_response.status_code == 200:
                     queue_data = queue_response.json()
                     
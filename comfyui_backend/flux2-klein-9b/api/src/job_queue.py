@@ -4,7 +4,7 @@ Uses Redis to store job state and results.
 """
 
 import os
-import json
+import orjson
 import uuid
 import asyncio
 from datetime import datetime
@@ -78,12 +78,14 @@ class JobQueueService:
             "completed_at": None
         }
         
+        # orjson serializes in native code and emits bytes directly,
+        # which redis-py accepts without a str->utf8 encode
         await self.redis_client.setex(
             self._job_key(job_id),
             self.job_ttl,
-            json.dumps(job_data)
+            orjson.dumps(job_data, default=str)
         )
-        
+
         logger.info(f"Created job {job_id}")
         return job_id
     
@@ -93,7 +95,7 @@ class JobQueueService:
         
         data = await self.redis_client.get(self._job_key(job_id))
         if data:
-            return json.loads(data)
+            return orjson.loads(data)
         return None
     
     async def update_job_status(
@@ -124,9 +126,9 @@ class JobQueueService:
         await self.redis_client.setex(
             self._job_key(job_id),
             self.job_ttl,
-            json.dumps(job_data)
+            orjson.dumps(job_data, default=str)
         )
-        
+
         logger.info(f"Updated job {job_id} to status {status.value}")
 
 
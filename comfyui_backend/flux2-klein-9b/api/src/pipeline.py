@@ -2,6 +2,7 @@ import os
 import time
 import uuid
 import base64
+import orjson
 from PIL import Image
 from io import BytesIO
 from typing import Any, List
@@ -9,9 +10,13 @@ from fastapi import HTTPException, status
 
 from .utils.logger import logger
 from .schema import ProcessRequest
-from .comfy import modify_workflow, poll_for_result, cleanup_reference_images
+from .comfy import (
+    modify_workflow,
+    poll_for_result,
+    cleanup_reference_images,
+    get_client_session,
+)
 from config import WORKFLOW_TEMPLATE, COMFYUI_SERVER
-import requests
 
 
 class Pipeline:
@@ -27,7 +32,7 @@ class Pipeline:
             uuid_name = uuid.uuid4()
 
             # Modify workflow with Flux2 parameters
-            modified_workflow, saved_ref_filenames = modify_workflow(
+            modified_workflow, saved_ref_filenames = await modify_workflow(
                 WORKFLOW_TEMPLATE,
                 prompt=self.request.prompt,
                 width=self.request.width,
@@ -44,9 +49,16 @@ class Pipeline:
             }
 
             logger.info(f"Submitting job to ComfyUI server: {COMFYUI_SERVER}")
-            response = requests.post(f"{COMFYUI_SERVER}/prompt", json=payload)
-            response.raise_for_status()
-            prompt_id = response.json()["prompt_id"]
+            session = await get_client_session()
+            # orjson encodes the full workflow payload (large when
+            # reference images ride along) in native code
+            async with session.post(
+                f"{COMFYUI_SERVER}/prompt",
+                data=orjson.dumps(payload),
+                headers={"Content-Type": "application/json"},
+            ) as response:
+                response.raise_for_status()
+                prompt_id = (await response.json())["prompt_id"]
             print(f"ComfyUI prompt ID: {prompt_id}")
 
             # Poll for result
@@ -60,11 +72,18 @@ class Pipeline:
                     detail="ComfyUI finished but output file not found.",
                 )
 
-            # Convert output to base64
-            image = Image.open(output_image_path_container)
-            buffered = BytesIO()
-            image.save(buffered, format="png")
-            output_image_base64 = base64.b64encode(buffered.getvalue())
+            # Convert output to base64. ComfyUI's SaveImage already
+            # writes PNG, so stream the file bytes straight through and
+            # only pay a PIL decode+encode if it is something else
+            with open(output_image_path_container, "rb") as f:
+                raw_bytes = f.read()
+            if raw_bytes[:8] == b"\x89PNG\r\n\x1a\n":
+                output_image_base64 = base64.b64encode(raw_bytes)
+            else:
+                image = Image.open(BytesIO(raw_bytes))
+                buffered = BytesIO()
+                image.save(buffered, format="png")
+                output_image_base64 = base64.b64encode(buffered.getvalue())
 
             end = time.perf_counter()
             return {